@@ -9,22 +9,30 @@ from src.feedback import generate_feedback
 from src.evaluator import evaluate_schedule
 from src.logger_config import logger
 
-# File paths
+# File paths (intermediate artifacts are Parquet; CSV is an optional export)
 STUDENTS_FILE = "data/students.csv"
 TEACHERS_FILE = "data/teachers.csv"
-OUTPUT_FILE = "output/schedule.csv"
-FEEDBACK_FILE = "output/feedback.csv"
+OUTPUT_FILE = "output/schedule.parquet"
+FEEDBACK_FILE = "output/feedback.parquet"
+
+# Set to True to also export the schedule as CSV for manual inspection
+EXPORT_CSV = False
+
+# Set to e.g. 100_000 to stream very large CSVs in bounded-memory chunks
+CSV_CHUNKSIZE = None
 
 
 def main():
     try:
         # Load data
-        students, teachers = load_data(STUDENTS_FILE, TEACHERS_FILE)
+        students, teachers = load_data(
+            STUDENTS_FILE, TEACHERS_FILE, chunksize=CSV_CHUNKSIZE
+        )
         logger.info(f"Loaded {len(students)} students and {len(teachers)} teachers.")
 
         # Generate (or reuse) feedback
         if os.path.exists(FEEDBACK_FILE):
-            feedback_df = pd.read_csv(FEEDBACK_FILE)
+            feedback_df = pd.read_parquet(FEEDBACK_FILE)
         else:
             empty_schedule = pd.DataFrame(
                 columns=["student_id", "teacher_id", "time_slot"]
@@ -32,14 +40,15 @@ def main():
             feedback_df = generate_feedback(empty_schedule, feedback_file=FEEDBACK_FILE)
 
         # Run matching once with feedback loop
-        schedule = match_with_feedback_loop(students, teachers, feedback_df)
-        schedule_df = pd.DataFrame(schedule)
+        schedule_df = match_with_feedback_loop(students, teachers, feedback_df)
         logger.info(f"Matching completed. Total assignments: {len(schedule_df)}")
 
         # Save schedule
         os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-        schedule_df.to_csv(OUTPUT_FILE, index=False)
+        schedule_df.to_parquet(OUTPUT_FILE, engine="pyarrow", compression="snappy")
         logger.info(f"Schedule saved to {OUTPUT_FILE}")
+        if EXPORT_CSV:
+            schedule_df.to_csv(OUTPUT_FILE.replace(".parquet", ".csv"), index=False)
 
         # Generate new feedback for this run
         generate_feedback(schedule_df, feedback_file=FEEDBACK_FILE)
@@ -1,5 +1,5 @@
 # Standard library imports
-from typing import Tuple
+from typing import Optional, Tuple
 
 # Third-party library imports
 import pandas as pd
@@ -9,44 +9,71 @@ from .logger_config import logger
 
 
 # Function to preprocess list fields safely
-def safe_split(value, field_name: str, default: str) -> list:
+def split_list_column(column: pd.Series, field_name: str, default: str) -> pd.Series:
     """
-    Safely split comma-separated strings into a list.
-    Handles missing or invalid values by logging and returning a default.
+    Split a comma-separated string column into lists using vectorized
+    pandas string ops. Missing or blank cells are logged once (with a row
+    count) and replaced with [default].
     """
-    if pd.isna(value) or str(value).strip() == "":
-        logger.warning(f"Missing value for '{field_name}', using default '{default}'")
-        return [default]
-    return [item.strip() for item in str(value).split(",") if item.strip()]
+    missing = column.isna() | (column.astype(str).str.strip() == "")
+    if missing.any():
+        logger.warning(
+            f"Missing value for '{field_name}' in {int(missing.sum())} rows, "
+            f"using default '{default}'"
+        )
+    return (
+        column.where(~missing, default)
+        .astype(str)
+        .str.split(",")
+        .map(lambda items: [item.strip() for item in items if item.strip()] or [default])
+    )
+
+
+# Per-chunk preprocessing for student data
+def _preprocess_students(students: pd.DataFrame) -> pd.DataFrame:
+    """Drop rows without a student_id and split the list columns."""
+    initial_count = len(students)
+
+    # Drop rows with missing student_id
+    students = students.dropna(subset=["student_id"])
+    dropped = initial_count - len(students)
+    if dropped > 0:
+        logger.warning(f"Dropped {dropped} invalid student rows (missing student_id)")
+
+    # Preprocess list fields with safe defaults
+    students["subjects"] = split_list_column(
+        students["subjects"], "subjects", "Unknown"
+    )
+    students["preferred_time_slots"] = split_list_column(
+        students["preferred_time_slots"], "preferred_time_slots", "N/A"
+    )
+    return students
 
 
 # Function to load and preprocess student data
-def load_students(file_path: str) -> pd.DataFrame:
+def load_students(file_path: str, chunksize: Optional[int] = None) -> pd.DataFrame:
     """
     Reads the Students CSV file and preprocesses the data.
     - Drops invalid rows (missing student_id).
     - Converts 'subjects' and 'preferred_time_slots' into lists.
     - Fills defaults for missing values.
+    - When chunksize is given, reads and preprocesses the file in
+      bounded-memory chunks instead of one shot.
     """
     try:
-        students = pd.read_csv(file_path)
-        initial_count = len(students)
-
-        # Drop rows with missing student_id
-        students = students.dropna(subset=["student_id"])
-        dropped = initial_count - len(students)
-        if dropped > 0:
-            logger.warning(
-                f"Dropped {dropped} invalid student rows (missing student_id)"
+        if chunksize is None:
+            students = _preprocess_students(
+                pd.read_csv(file_path, dtype={"student_id": "Int64"})
+            )
+        else:
+            reader = pd.read_csv(
+                file_path, chunksize=chunksize, dtype={"student_id": "Int64"}
+            )
+            students = pd.concat(
+                (_preprocess_students(chunk) for chunk in reader),
+                copy=False,
+                ignore_index=True,
             )
-
-        # Preprocess list fields with safe defaults
-        students["subjects"] = students["subjects"].apply(
-            lambda x: safe_split(x, "subjects", "Unknown")
-        )
-        students["preferred_time_slots"] = students["preferred_time_slots"].apply(
-            lambda x: safe_split(x, "preferred_time_slots", "N/A")
-        )
 
         logger.info(f"Loaded {len(students)} students from {file_path}")
         logger.info("Preprocessed student subjects and time slots")
@@ -57,33 +84,51 @@ def load_students(file_path: str) -> pd.DataFrame:
         raise
 
 
+# Per-chunk preprocessing for teacher data
+def _preprocess_teachers(teachers: pd.DataFrame) -> pd.DataFrame:
+    """Drop rows without a teacher_id and split the list columns."""
+    initial_count = len(teachers)
+
+    # Drop rows with missing teacher_id
+    teachers = teachers.dropna(subset=["teacher_id"])
+    dropped = initial_count - len(teachers)
+    if dropped > 0:
+        logger.warning(f"Dropped {dropped} invalid teacher rows (missing teacher_id)")
+
+    # Preprocess list fields with safe defaults
+    teachers["subjects"] = split_list_column(
+        teachers["subjects"], "subjects", "Unknown"
+    )
+    teachers["available_time_slots"] = split_list_column(
+        teachers["available_time_slots"], "available_time_slots", "N/A"
+    )
+    return teachers
+
+
 # Function to load and preprocess teacher data
-def load_teachers(file_path: str) -> pd.DataFrame:
+def load_teachers(file_path: str, chunksize: Optional[int] = None) -> pd.DataFrame:
     """
     Reads the Teachers CSV file and preprocesses the data.
     - Drops invalid rows (missing teacher_id).
     - Converts 'subjects' and 'available_time_slots' into lists.
     - Fills defaults for missing values.
+    - When chunksize is given, reads and preprocesses the file in
+      bounded-memory chunks instead of one shot.
     """
     try:
-        teachers = pd.read_csv(file_path)
-        initial_count = len(teachers)
-
-        # Drop rows with missing teacher_id
-        teachers = teachers.dropna(subset=["teacher_id"])
-        dropped = initial_count - len(teachers)
-        if dropped > 0:
-            logger.warning(
-                f"Dropped {dropped} invalid teacher rows (missing teacher_id)"
+        if chunksize is None:
+            teachers = _preprocess_teachers(
+                pd.read_csv(file_path, dtype={"teacher_id": "Int64"})
+            )
+        else:
+            reader = pd.read_csv(
+                file_path, chunksize=chunksize, dtype={"teacher_id": "Int64"}
+            )
+            teachers = pd.concat(
+                (_preprocess_teachers(chunk) for chunk in reader),
+                copy=False,
+                ignore_index=True,
             )
-
-        # Preprocess list fields with safe defaults
-        teachers["subjects"] = teachers["subjects"].apply(
-            lambda x: safe_split(x, "subjects", "Unknown")
-        )
-        teachers["available_time_slots"] = teachers["available_time_slots"].apply(
-            lambda x: safe_split(x, "available_time_slots", "N/A")
-        )
 
         logger.info(f"Loaded {len(teachers)} teachers from {file_path}")
         logger.info("Preprocessed teacher subjects and available time slots")
@@ -96,15 +141,16 @@ def load_teachers(file_path: str) -> pd.DataFrame:
 
 # Function to load both students and teachers together
 def load_data(
-    students_file: str, teachers_file: str
+    students_file: str, teachers_file: str, chunksize: Optional[int] = None
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Loads and preprocesses both students and teachers CSV files.
     - Cleans missing data.
     - Logs progress and warnings.
+    - chunksize is passed through to both loaders for streaming reads.
     """
     logger.info("Starting to load student and teacher data")
-    students = load_students(students_file)
-    teachers = load_teachers(teachers_file)
+    students = load_students(students_file, chunksize=chunksize)
+    teachers = load_teachers(teachers_file, chunksize=chunksize)
     logger.info("Successfully loaded and preprocessed both students and teachers")
     return students, teachers
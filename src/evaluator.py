@@ -5,7 +5,7 @@ import os
 # Project-specific imports
 from .logger_config import logger
 
-FEEDBACK_FILE = "data/feedback.csv"
+FEEDBACK_FILE = "data/feedback.parquet"
 
 
 def evaluate_schedule(
@@ -21,7 +21,7 @@ def evaluate_schedule(
         schedule (pd.DataFrame): Schedule with student-teacher assignments
         students (pd.DataFrame): Original student dataset
         teachers (pd.DataFrame): Original teacher dataset
-        feedback_file (str): Path to the feedback CSV containing ratings
+        feedback_file (str): Path to the feedback Parquet file containing ratings
 
     Logs:
         - Total number of students
@@ -38,15 +38,20 @@ def evaluate_schedule(
         logger.error(f"Schedule missing required columns: {missing}")
         raise ValueError(f"Schedule missing required columns: {missing}")
 
-    # Remove placeholder rows (students/teachers with no valid slot)
-    clean_schedule = schedule[schedule["time_slot"] != "N/A"].copy()
+    # Remove placeholder rows (students/teachers with no valid slot), then
+    # cast the key columns to category so merge/groupby hash small integer
+    # codes instead of Python objects
+    key_cols = ("student_id", "teacher_id", "time_slot")
+    clean_schedule = schedule[schedule["time_slot"] != "N/A"].astype(
+        {col: "category" for col in key_cols}
+    )
 
     # Count unique students that were successfully matched
     num_students_matched = clean_schedule["student_id"].nunique()
 
     # Calculate teacher time slot utilization
     teacher_usage = (
-        clean_schedule.groupby(["teacher_id", "time_slot"])
+        clean_schedule.groupby(["teacher_id", "time_slot"], observed=True)
         .size()
         .reset_index(name="students_assigned")
     )
@@ -59,10 +64,13 @@ def evaluate_schedule(
     # Include Average Satisfaction Score
     if os.path.exists(feedback_file):
         try:
-            feedback_df = pd.read_csv(feedback_file)
+            feedback_df = pd.read_parquet(feedback_file)
 
-            # Exclude feedback with placeholder slots
-            feedback_df = feedback_df[feedback_df["time_slot"] != "N/A"]
+            # Exclude feedback with placeholder slots and align key dtypes
+            # with the (categorical) schedule so the merge stays on codes
+            feedback_df = feedback_df[feedback_df["time_slot"] != "N/A"].astype(
+                {col: clean_schedule[col].dtype for col in key_cols}
+            )
 
             # Merge schedule with feedback
             merged_df = clean_schedule.merge(
@@ -80,7 +88,11 @@ def evaluate_schedule(
 
                 # Calculate average satisfaction per teacher
                 teacher_satisfaction = (
-                    merged_df.groupby("teacher_id")["rating"].mean().reset_index()
+                    merged_df.groupby("teacher_id", observed=True, sort=False)[
+                        "rating"
+                    ]
+                    .mean()
+                    .reset_index()
                 )
                 teacher_satisfaction.rename(
                     columns={"rating": "avg_satisfaction"}, inplace=True
@@ -1,14 +1,14 @@
 # Standard library imports
-import random
 import os
 
 # Third-party library imports
+import numpy as np
 import pandas as pd
 
 # Project-specific imports
 from .logger_config import logger
 
-FEEDBACK_FILE = "data/feedback.csv"
+FEEDBACK_FILE = "data/feedback.parquet"
 
 # Predefined realistic comments
 COMMENTS_POOL = [
@@ -38,34 +38,33 @@ def generate_feedback(
     if not required_columns.issubset(schedule_df.columns):
         raise ValueError(f"schedule_df must contain columns: {required_columns}")
 
-    feedback_list = []
-    for _, row in schedule_df.iterrows():
-        # Logic to simulate rating: higher if student has 1:1 match, otherwise slightly lower
-        if "group" in row.get("match_type", ""):
-            rating = random.randint(3, 5)
-        else:
-            rating = random.randint(4, 5)
+    n = len(schedule_df)
+    rng = np.random.default_rng()
 
-        # Randomly pick a comment from the pool
-        comment = random.choice(COMMENTS_POOL)
-
-        feedback_list.append(
-            {
-                "student_id": row["student_id"],
-                "teacher_id": row["teacher_id"],
-                "time_slot": row["time_slot"],
-                "rating": rating,
-                "comments": comment,
-            }
+    # Logic to simulate rating: higher if student has 1:1 match, otherwise
+    # slightly lower. Generated as whole columns instead of per-row calls.
+    if "lesson_type" in schedule_df.columns:
+        is_group = (
+            schedule_df["lesson_type"].fillna("").str.contains("group").to_numpy()
         )
+    else:
+        is_group = np.zeros(n, dtype=bool)
+    ratings = np.where(
+        is_group, rng.integers(3, 6, size=n), rng.integers(4, 6, size=n)
+    )
+
+    # Randomly pick comments from the pool
+    comments = rng.choice(COMMENTS_POOL, size=n)
 
-    feedback_df = pd.DataFrame(feedback_list)
+    feedback_df = schedule_df[["student_id", "teacher_id", "time_slot"]].assign(
+        rating=ratings, comments=comments
+    )
 
     # Ensure data directory exists
     os.makedirs(os.path.dirname(feedback_file), exist_ok=True)
 
-    # Save feedback to CSV
-    feedback_df.to_csv(feedback_file, index=False)
+    # Save feedback to Parquet (columnar, snappy-compressed)
+    feedback_df.to_parquet(feedback_file, engine="pyarrow", compression="snappy")
     logger.info(f"Feedback generated and saved to {feedback_file}")
 
     return feedback_df
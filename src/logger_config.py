@@ -1,6 +1,8 @@
 # Standard library imports
+import atexit
 import logging
 import os
+from logging.handlers import MemoryHandler
 
 # Create logs directory if it doesn't exist
 os.makedirs("logs", exist_ok=True)
@@ -12,9 +14,13 @@ logger.setLevel(logging.INFO)
 # Formatter for log messages
 formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 
-# File handler (writes to project.log)
+# File handler (writes to project.log), buffered in memory so hot loops
+# don't pay a disk flush per record; errors flush immediately
 file_handler = logging.FileHandler("logs/project.log")
 file_handler.setFormatter(formatter)
+memory_handler = MemoryHandler(
+    capacity=10_000, flushLevel=logging.ERROR, target=file_handler
+)
 
 # Console handler (prints to console)
 console_handler = logging.StreamHandler()
@@ -22,5 +28,8 @@ console_handler.setFormatter(formatter)
 
 # Add handlers to the logger (avoid duplicates)
 if not logger.handlers:
-    logger.addHandler(file_handler)
+    logger.addHandler(memory_handler)
     logger.addHandler(console_handler)
+
+# Make sure buffered records reach the file on interpreter exit
+atexit.register(memory_handler.flush)
@@ -1,41 +1,63 @@
 # Standard library imports
-from typing import Dict, List
-from random import randint, choice
+import hashlib
+import os
 from collections import defaultdict
 
 # Third-party library imports
+import joblib
+import numpy as np
 import pandas as pd
+from scipy import sparse
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import MultiLabelBinarizer
 
 # Project-specific imports
 from .logger_config import logger
-from .utils import subject_overlap, available_time_overlap
+from .utils import intersect_sorted
 
+MODEL_FILE = "models/teacher_recommender.joblib"
 
-# Helper function
-def assign_student_to_slot(
-    student_id: int, teacher_id: int, slot: str, current_count: int
-) -> Dict:
-    """Create a schedule entry for a student-teacher assignment and log it."""
-    lesson_type = "1:1" if current_count == 0 else "group"
-    logger.info(
-        f"Assigning Student {student_id} to Teacher {teacher_id} at {slot} ({lesson_type})"
+
+# Lesson types are stored as int codes while matching and decoded to their
+# labels once when the schedule DataFrame is built
+LESSON_TYPE_1ON1 = 0
+LESSON_TYPE_GROUP = 1
+
+
+def _build_schedule_frame(
+    sched_student: np.ndarray,
+    sched_teacher: np.ndarray,
+    sched_slot: np.ndarray,
+    sched_lesson: np.ndarray,
+    n_assigned: int,
+) -> pd.DataFrame:
+    """Assemble the schedule DataFrame from the preallocated columns."""
+    return pd.DataFrame(
+        {
+            "student_id": sched_student[:n_assigned],
+            "teacher_id": sched_teacher[:n_assigned],
+            "time_slot": sched_slot[:n_assigned],
+            "lesson_type": np.where(
+                sched_lesson[:n_assigned] == LESSON_TYPE_1ON1, "1:1", "group"
+            ),
+        }
     )
-    return {
-        "student_id": student_id,
-        "teacher_id": teacher_id,
-        "time_slot": slot,
-        "lesson_type": lesson_type,
-    }
 
 
 def match_students_to_teachers(
     students: pd.DataFrame, teachers: pd.DataFrame
-) -> List[Dict]:
-    """Baseline matching based on subjects and time slots."""
-    schedule = []
+) -> pd.DataFrame:
+    """Baseline matching based on subjects and time slots.
+
+    Candidate lookup (the read-only part of the work) runs as a separate
+    phase from the sequential capacity updates, so the commit phase needs
+    no locking.
 
+    Returns the schedule as a DataFrame with columns student_id,
+    teacher_id, time_slot and lesson_type.
+    """
     required_student_cols = {"student_id", "subjects", "preferred_time_slots"}
     required_teacher_cols = {
         "teacher_id",
@@ -58,44 +80,126 @@ def match_students_to_teachers(
         f"Starting student-teacher matching for {len(students)} students and {len(teachers)} teachers"
     )
 
-    teacher_slots = {
-        tid: {slot: 0 for slot in teacher["available_time_slots"]}
-        for tid, teacher in teachers.set_index("teacher_id").iterrows()
-    }
+    # Cache per-teacher attributes as plain dicts (row order preserved) and
+    # build an inverted index subject -> teacher row positions, so each
+    # student only visits teachers that actually share a subject.
+    teacher_records = teachers.to_dict("records")
+    subj_to_teachers = defaultdict(set)
+    for pos, teacher in enumerate(teacher_records):
+        for subject in teacher["subjects"]:
+            subj_to_teachers[subject].add(pos)
+
+    # Integer-encode time slots once so the per-candidate overlap test runs
+    # as a two-pointer merge over sorted int32 ids (numba-compiled when
+    # available) instead of building Python sets per pair. Ids follow the
+    # sorted slot names, so iterating the intersection preserves the old
+    # sorted-slot assignment order.
+    slot_names = sorted(
+        {slot for slots in teachers["available_time_slots"] for slot in slots}
+        | {slot for slots in students["preferred_time_slots"] for slot in slots}
+    )
+    slot_id = {slot: i for i, slot in enumerate(slot_names)}
+
+    def encode_slots(slots):
+        # Dedup: list cells may repeat a slot (the CSV is not cleaned of
+        # duplicates), and repeated ids would double-set mask bits below
+        return np.array(sorted({slot_id[slot] for slot in slots}), dtype=np.int32)
+
+    teacher_slot_ids = [
+        encode_slots(teacher["available_time_slots"]) for teacher in teacher_records
+    ]
+    student_slot_ids = [
+        encode_slots(slots) for slots in students["preferred_time_slots"]
+    ]
+
+    # Slot-capacity counters as one contiguous (teacher position, slot id)
+    # array instead of a dict of per-teacher dicts keyed by slot name
+    counts = np.zeros((len(teachers), len(slot_names)), dtype=np.int16)
+    caps = teachers["max_students_per_slot"].to_numpy(dtype=np.int16)
+
+    # With at most 64 distinct slots, each side's slot set packs into one
+    # 64-bit mask: the "shared slot with remaining capacity" test becomes
+    # an AND plus a lowest-set-bit scan, and a teacher's bit is cleared the
+    # moment a slot fills up. Lowest bit = smallest slot id, so the pick
+    # order matches the sorted intersection path.
+    use_bitmask = len(slot_names) <= 64
+    if use_bitmask:
+        student_pref_mask = [
+            sum(1 << int(code) for code in codes) for codes in student_slot_ids
+        ]
+        teacher_avail = [
+            sum(1 << int(code) for code in codes) if caps[pos] > 0 else 0
+            for pos, codes in enumerate(teacher_slot_ids)
+        ]
+
+    # Preallocate one column per schedule field (each student is assigned
+    # at most once); the DataFrame is built from these arrays at the end
+    n = len(students)
+    sched_student = np.empty(n, dtype=np.int64)
+    sched_teacher = np.empty(n, dtype=np.int64)
+    sched_slot = np.empty(n, dtype=object)
+    sched_lesson = np.empty(n, dtype=np.int8)
+    n_assigned = 0
 
-    for _, student in students.iterrows():
+    # Phase 1 (read-only, parallelizable): per student, the candidate
+    # teachers sharing a subject and the slot ids shared with each. Sorted
+    # positions keep the original first-fit teacher order.
+    def candidate_options(i):
+        candidates = set().union(
+            *(subj_to_teachers[subject] for subject in students["subjects"].iat[i])
+        )
+        positions = sorted(candidates)
+        if use_bitmask:
+            # Slot feasibility is resolved by the masks in phase 2
+            return positions
+        return [
+            (pos, intersect_sorted(student_slot_ids[i], teacher_slot_ids[pos]))
+            for pos in positions
+        ]
+
+    options = [candidate_options(i) for i in range(n)]
+
+    # Phase 2 (sequential): commit assignments against the shared capacity
+    # counters; single-threaded, so no locks or atomics are required.
+    for i, student in enumerate(students.itertuples(index=False)):
         matched = False
-        for _, teacher in teachers.iterrows():
-            if subject_overlap(student["subjects"], teacher["subjects"]):
-                common_slots = available_time_overlap(
-                    student["preferred_time_slots"], teacher["available_time_slots"]
-                )
-                for slot in common_slots:
-                    if (
-                        teacher_slots[teacher["teacher_id"]][slot]
-                        < teacher["max_students_per_slot"]
-                    ):
-                        current_count = teacher_slots[teacher["teacher_id"]][slot]
-                        schedule.append(
-                            assign_student_to_slot(
-                                student["student_id"],
-                                teacher["teacher_id"],
-                                slot,
-                                current_count,
-                            )
-                        )
-                        teacher_slots[teacher["teacher_id"]][slot] += 1
-                        matched = True
+        for option in options[i]:
+            if use_bitmask:
+                pos = option
+                mask = teacher_avail[pos] & student_pref_mask[i]
+                if not mask:
+                    continue
+                code = (mask & -mask).bit_length() - 1
+            else:
+                pos, common_slot_ids = option
+                code = -1
+                for candidate_code in common_slot_ids:
+                    if counts[pos, candidate_code] < caps[pos]:
+                        code = candidate_code
                         break
-            if matched:
-                break
-        if not matched:
-            logger.warning(
-                f"No available match found for Student {student['student_id']}"
+                if code < 0:
+                    continue
+
+            teacher = teacher_records[pos]
+            sched_student[n_assigned] = student.student_id
+            sched_teacher[n_assigned] = teacher["teacher_id"]
+            sched_slot[n_assigned] = slot_names[code]
+            sched_lesson[n_assigned] = (
+                LESSON_TYPE_1ON1 if counts[pos, code] == 0 else LESSON_TYPE_GROUP
             )
+            n_assigned += 1
+            counts[pos, code] += 1
+            if use_bitmask and counts[pos, code] == caps[pos]:
+                teacher_avail[pos] &= ~(1 << code)
+            matched = True
+            break
+        if not matched:
+            logger.warning(f"No available match found for Student {student.student_id}")
 
-    logger.info(f"Completed matching. Total assignments: {len(schedule)}")
-    return schedule
+    logger.info(f"Completed matching. Total assignments: {n_assigned}")
+    return _build_schedule_frame(
+        sched_student, sched_teacher, sched_slot, sched_lesson, n_assigned
+    )
 
 
 def train_teacher_recommender(schedule: pd.DataFrame, students: pd.DataFrame):
@@ -109,11 +213,58 @@ def train_teacher_recommender(schedule: pd.DataFrame, students: pd.DataFrame):
     return clf, mlb
 
 
+def _hash_training_inputs(students: pd.DataFrame, teachers: pd.DataFrame) -> str:
+    """Fingerprint the data the recommender is trained on."""
+    digest = hashlib.sha256()
+    for df in (students, teachers):
+        digest.update(
+            pd.util.hash_pandas_object(df.astype(str), index=False).values.tobytes()
+        )
+    return digest.hexdigest()
+
+
+def _load_or_train_recommender(students: pd.DataFrame, teachers: pd.DataFrame):
+    """
+    Return a (clf, mlb) pair, reusing the model cached on disk when the
+    student/teacher data is unchanged and retraining (and re-caching) when
+    it is not.
+    """
+    fingerprint = _hash_training_inputs(students, teachers)
+
+    if os.path.exists(MODEL_FILE):
+        try:
+            cached = joblib.load(MODEL_FILE)
+            if cached.get("fingerprint") == fingerprint:
+                logger.info("Loaded cached teacher recommender (inputs unchanged)")
+                return cached["clf"], cached["mlb"]
+        except Exception as e:
+            logger.warning(f"Could not load cached recommender, retraining: {e}")
+
+    # Use baseline matching just for training
+    schedule_df = match_students_to_teachers(students, teachers)
+    clf, mlb = train_teacher_recommender(schedule_df, students)
+
+    os.makedirs(os.path.dirname(MODEL_FILE), exist_ok=True)
+    joblib.dump({"clf": clf, "mlb": mlb, "fingerprint": fingerprint}, MODEL_FILE)
+    logger.info(f"Trained and cached teacher recommender at {MODEL_FILE}")
+    return clf, mlb
+
+
 def match_with_feedback_loop(
     students: pd.DataFrame, teachers: pd.DataFrame, feedback_df: pd.DataFrame = None
-) -> List[Dict]:
-    """ML-guided matching with feedback loop."""
-    final_schedule = []
+) -> pd.DataFrame:
+    """ML-guided matching with feedback loop.
+
+    Returns the schedule as a DataFrame with columns student_id,
+    teacher_id, time_slot and lesson_type.
+    """
+    # Preallocated schedule columns, filled by index as students are placed
+    n = len(students)
+    sched_student = np.empty(n, dtype=np.int64)
+    sched_teacher = np.empty(n, dtype=np.int64)
+    sched_slot = np.empty(n, dtype=object)
+    sched_lesson = np.empty(n, dtype=np.int8)
+    n_assigned = 0
 
     teacher_weights = defaultdict(lambda: 1.0)
     if feedback_df is not None and not feedback_df.empty:
@@ -121,83 +272,129 @@ def match_with_feedback_loop(
         for tid, rating in avg_ratings.items():
             teacher_weights[tid] = rating / 5.0
 
-    teacher_slots = {
-        tid: {slot: 0 for slot in teacher["available_time_slots"]}
-        for tid, teacher in teachers.set_index("teacher_id").iterrows()
-    }
+    # Integer slot ids plus contiguous capacity counters, mirroring the
+    # baseline matcher: counts[pos, code] tracks how many students teacher
+    # at row pos already has in slot code, allowed marks available slots
+    slot_names = sorted(
+        {slot for slots in teachers["available_time_slots"] for slot in slots}
+        | {slot for slots in students["preferred_time_slots"] for slot in slots}
+    )
+    slot_id = {slot: i for i, slot in enumerate(slot_names)}
+    counts = np.zeros((len(teachers), len(slot_names)), dtype=np.int16)
+    caps = teachers["max_students_per_slot"].to_numpy(dtype=np.int16)
+    allowed = np.zeros((len(teachers), len(slot_names)), dtype=bool)
+    for pos, slots in enumerate(teachers["available_time_slots"]):
+        allowed[pos, [slot_id[slot] for slot in slots]] = True
 
-    # Use baseline matching just for training
-    initial_schedule = match_students_to_teachers(students, teachers)
-    schedule_df = pd.DataFrame(initial_schedule)
-    clf, mlb = train_teacher_recommender(schedule_df, students)
+    clf, mlb = _load_or_train_recommender(students, teachers)
 
-    for _, student in students.iterrows():
-        candidate_teachers = teachers[
-            teachers.apply(
-                lambda t: subject_overlap(student["subjects"], t["subjects"]), axis=1
-            )
-        ].copy()  # FIX: avoid SettingWithCopyWarning
+    # Encode every student's subjects for the classifier once, up front
+    X_students = mlb.transform(students["subjects"])
+
+    # One-hot encode subjects for both sides once; a single sparse matmul
+    # then yields every student/teacher subject overlap in one shot.
+    subject_mlb = MultiLabelBinarizer()
+    subject_mlb.fit(teachers["subjects"].tolist() + students["subjects"].tolist())
+    teacher_matrix = sparse.csr_matrix(subject_mlb.transform(teachers["subjects"]))
+    student_matrix = sparse.csr_matrix(subject_mlb.transform(students["subjects"]))
+    overlap = (student_matrix @ teacher_matrix.T).astype(bool).tocsr()
 
-        candidate_teachers["weight"] = candidate_teachers["teacher_id"].map(
-            teacher_weights
+    # Expand each teacher into one right-hand node per (slot, capacity copy)
+    # so the solver enforces max_students_per_slot implicitly, then solve the
+    # whole assignment as one weighted bipartite matching instead of a greedy
+    # per-student scan.
+    teacher_records = teachers.to_dict("records")
+    right_nodes = []  # (teacher position, slot id)
+    for pos, teacher in enumerate(teachers.itertuples(index=False)):
+        # dict.fromkeys dedups repeated slot entries so a duplicated cell
+        # cannot multiply the teacher's effective capacity
+        for slot in dict.fromkeys(teacher.available_time_slots):
+            right_nodes.extend([(pos, slot_id[slot])] * teacher.max_students_per_slot)
+
+    nodes_by_teacher = defaultdict(list)
+    for j, (pos, code) in enumerate(right_nodes):
+        nodes_by_teacher[pos].append((j, code))
+
+    rows, cols, costs = [], [], []
+    for i, student in enumerate(students.itertuples(index=False)):
+        preferred = {slot_id[slot] for slot in student.preferred_time_slots}
+        for pos in overlap[i].indices:
+            # Shift weights by 1 so a zero-rated teacher still forms a
+            # (nonzero-cost) edge; lower cost = better-rated teacher.
+            cost = -(1.0 + teacher_weights[teacher_records[pos]["teacher_id"]])
+            for j, code in nodes_by_teacher[pos]:
+                if code in preferred:
+                    rows.append(i)
+                    cols.append(j)
+                    costs.append(cost)
+
+    assignment = {}
+    if rows:
+        biadjacency = sparse.csr_matrix(
+            (costs, (rows, cols)), shape=(len(students), len(right_nodes))
         )
-        candidate_teachers = candidate_teachers.sort_values("weight", ascending=False)
+        try:
+            row_ind, col_ind = min_weight_full_bipartite_matching(biadjacency)
+        except ValueError:
+            # No full matching exists (e.g. some students have no feasible
+            # edge); retry densely with a penalty on missing edges and drop
+            # any penalty assignments afterwards.
+            dense = np.zeros((len(students), len(right_nodes)))
+            dense[rows, cols] = costs
+            row_ind, col_ind = linear_sum_assignment(dense)
+            feasible = dense[row_ind, col_ind] < 0
+            row_ind, col_ind = row_ind[feasible], col_ind[feasible]
+        assignment = dict(zip(row_ind, col_ind))
 
+    unmatched = []
+    for i, student in enumerate(students.itertuples(index=False)):
+        if i not in assignment:
+            unmatched.append((i, student))
+            continue
+        pos, code = right_nodes[assignment[i]]
+        sched_student[n_assigned] = student.student_id
+        sched_teacher[n_assigned] = teacher_records[pos]["teacher_id"]
+        sched_slot[n_assigned] = slot_names[code]
+        sched_lesson[n_assigned] = (
+            LESSON_TYPE_1ON1 if counts[pos, code] == 0 else LESSON_TYPE_GROUP
+        )
+        n_assigned += 1
+        counts[pos, code] += 1
+
+    # Classifier fallback only for students the solver could not place.
+    # One batched forest inference for all unplaced students instead of a
+    # single-row predict per student; predicted teacher ids resolve to row
+    # positions through a dict built in one pass, not a frame scan
+    predictions = []
+    pos_by_teacher_id = {}
+    if unmatched:
+        pos_by_teacher_id = {
+            record["teacher_id"]: pos for pos, record in enumerate(teacher_records)
+        }
+        predictions = clf.predict(X_students[[i for i, _ in unmatched]])
+
+    for (i, student), predicted_teacher in zip(unmatched, predictions):
         assigned = False
-        for _, teacher in candidate_teachers.iterrows():
-            common_slots = available_time_overlap(
-                student["preferred_time_slots"], teacher["available_time_slots"]
-            )
-            for slot in common_slots:
-                if (
-                    teacher_slots[teacher["teacher_id"]][slot]
-                    < teacher["max_students_per_slot"]
-                ):
-                    current_count = teacher_slots[teacher["teacher_id"]][slot]
-                    final_schedule.append(
-                        assign_student_to_slot(
-                            student["student_id"],
-                            teacher["teacher_id"],
-                            slot,
-                            current_count,
-                        )
-                    )
-                    teacher_slots[teacher["teacher_id"]][slot] += 1
-                    assigned = True
-                    break
-            if assigned:
+        pos = pos_by_teacher_id[predicted_teacher]
+        for code in sorted({slot_id[slot] for slot in student.preferred_time_slots}):
+            if allowed[pos, code] and counts[pos, code] < caps[pos]:
+                sched_student[n_assigned] = student.student_id
+                sched_teacher[n_assigned] = predicted_teacher
+                sched_slot[n_assigned] = slot_names[code]
+                sched_lesson[n_assigned] = (
+                    LESSON_TYPE_1ON1 if counts[pos, code] == 0 else LESSON_TYPE_GROUP
+                )
+                n_assigned += 1
+                counts[pos, code] += 1
+                assigned = True
                 break
 
         if not assigned:
-            predicted_teacher = clf.predict(mlb.transform([student["subjects"]]))[0]
-            teacher_row = teachers[teachers["teacher_id"] == predicted_teacher].iloc[0]
-            common_slots = available_time_overlap(
-                student["preferred_time_slots"], teacher_row["available_time_slots"]
-            )
-            for slot in common_slots:
-                if (
-                    teacher_slots[predicted_teacher][slot]
-                    < teacher_row["max_students_per_slot"]
-                ):
-                    current_count = teacher_slots[predicted_teacher][slot]
-                    final_schedule.append(
-                        assign_student_to_slot(
-                            student["student_id"],
-                            predicted_teacher,
-                            slot,
-                            current_count,
-                        )
-                    )
-                    teacher_slots[predicted_teacher][slot] += 1
-                    assigned = True
-                    break
-
-        if not assigned:
-            logger.warning(
-                f"No available match found for Student {student['student_id']}"
-            )
+            logger.warning(f"No available match found for Student {student.student_id}")
 
     logger.info(
-        f"Feedback loop matching completed. Total assignments: {len(final_schedule)}"
+        f"Feedback loop matching completed. Total assignments: {n_assigned}"
+    )
+    return _build_schedule_frame(
+        sched_student, sched_teacher, sched_slot, sched_lesson, n_assigned
     )
-    return final_schedule
@@ -1,65 +1,148 @@
 # Standard library imports
-from typing import List
+import logging
+from typing import Collection, List
+
+# Third-party library imports
+import numpy as np
 
 # Project-specific imports
 from .logger_config import logger
 
+# Optional dependency: when numba is installed the integer overlap helpers
+# below are compiled to native code; otherwise they run as plain Python.
+try:
+    from numba import njit
+except ImportError:
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrap(func):
+            return func
+
+        return wrap
+
+
+# Collection types accepted by the overlap helpers; callers holding
+# prebuilt (frozen)sets can pass them to avoid any per-call set
+# construction
+_SET_TYPES = (set, frozenset)
+_COLLECTION_TYPES = (list,) + _SET_TYPES
+
 
 # Check if a student and teacher share at least one subject
-def subject_overlap(student_subjects: List[str], teacher_subjects: List[str]) -> bool:
+def subject_overlap(
+    student_subjects: Collection[str], teacher_subjects: Collection[str]
+) -> bool:
     """
     Returns True if there is at least one common subject between student and teacher.
-    Logs the result.
+    Logs the result at DEBUG level only.
 
     Args:
-        student_subjects (List[str]): Subjects the student wants to learn
-        teacher_subjects (List[str]): Subjects the teacher can teach
+        student_subjects (Collection[str]): Subjects the student wants to learn
+        teacher_subjects (Collection[str]): Subjects the teacher can teach
 
     Returns:
         bool: True if there is at least one overlapping subject, False otherwise
     """
     # Input validation
-    if not isinstance(student_subjects, list) or not isinstance(teacher_subjects, list):
-        raise TypeError("Both student_subjects and teacher_subjects must be lists")
-
-    if not all(isinstance(s, str) for s in student_subjects + teacher_subjects):
+    if not isinstance(student_subjects, _COLLECTION_TYPES) or not isinstance(
+        teacher_subjects, _COLLECTION_TYPES
+    ):
+        raise TypeError(
+            "Both student_subjects and teacher_subjects must be lists or sets"
+        )
+
+    if not all(isinstance(s, str) for s in student_subjects) or not all(
+        isinstance(s, str) for s in teacher_subjects
+    ):
         raise TypeError("All elements in subjects lists must be strings")
 
-    overlap = bool(set(student_subjects) & set(teacher_subjects))
+    # isdisjoint takes any iterable on the right, so at most one side ever
+    # needs converting
+    if not isinstance(student_subjects, _SET_TYPES):
+        student_subjects = frozenset(student_subjects)
+    overlap = not student_subjects.isdisjoint(teacher_subjects)
 
-    # Logging
-    logger.info(
-        f"Checked subject overlap: {student_subjects} & {teacher_subjects} => {overlap}"
-    )
+    # Logging (guarded: this runs once per student/teacher pair, so the
+    # f-string formatting alone would dominate the matcher otherwise)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            f"Checked subject overlap: {student_subjects} & {teacher_subjects} => {overlap}"
+        )
 
     return overlap
 
 
 # Get overlapping available time slots between student and teacher
 def available_time_overlap(
-    student_times: List[str], teacher_times: List[str]
+    student_times: Collection[str], teacher_times: Collection[str]
 ) -> List[str]:
     """
     Returns a sorted list of overlapping time slots where both student and teacher are available.
-    Logs the overlap.
+    Logs the overlap at DEBUG level only.
 
     Args:
-        student_times (List[str]): Time slots student prefers
-        teacher_times (List[str]): Time slots teacher is available
+        student_times (Collection[str]): Time slots student prefers
+        teacher_times (Collection[str]): Time slots teacher is available
 
     Returns:
         List[str]: Sorted list of common available time slots (empty if none)
     """
     # Input validation
-    if not isinstance(student_times, list) or not isinstance(teacher_times, list):
-        raise TypeError("Both student_times and teacher_times must be lists")
-
-    if not all(isinstance(t, str) for t in student_times + teacher_times):
+    if not isinstance(student_times, _COLLECTION_TYPES) or not isinstance(
+        teacher_times, _COLLECTION_TYPES
+    ):
+        raise TypeError("Both student_times and teacher_times must be lists or sets")
+
+    if not all(isinstance(t, str) for t in student_times) or not all(
+        isinstance(t, str) for t in teacher_times
+    ):
         raise TypeError("All elements in time lists must be strings")
 
-    overlap = sorted(set(student_times) & set(teacher_times))
+    if not isinstance(student_times, _SET_TYPES):
+        student_times = frozenset(student_times)
+    overlap = sorted(student_times.intersection(teacher_times))
 
-    # Logging
-    logger.info(f"Checked time overlap: {student_times} & {teacher_times} => {overlap}")
+    # Logging (guarded for the same reason as subject_overlap)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            f"Checked time overlap: {student_times} & {teacher_times} => {overlap}"
+        )
 
     return overlap
+
+
+# Integer-encoded variant of the overlap helpers. Callers map time slots
+# (or subjects) to small integer ids once and pass sorted int32 arrays, so
+# the hot loop runs on native ints with no per-call set allocation.
+@njit(cache=True)
+def intersect_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Returns the sorted intersection of two sorted int arrays via a
+    two-pointer merge.
+
+    Args:
+        a (np.ndarray): Sorted int32 ids
+        b (np.ndarray): Sorted int32 ids
+
+    Returns:
+        np.ndarray: Sorted array of ids present in both inputs
+    """
+    out = np.empty(min(len(a), len(b)), dtype=a.dtype)
+    i = 0
+    j = 0
+    k = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            out[k] = a[i]
+            k += 1
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return out[:k]